@@ -22,11 +22,30 @@ Reglas:
 - Intersecciones y Establecimientos: escanean /<sección>/excels y buscan UBIGEO en el catálogo por slug (y fallback por componentes).
 - Si el mapa no existe, el botón aparece deshabilitado.
 - Filtros: Departamento + Provincia + Distrito + UBIGEO (AND). Comparación ignora espacios y guiones bajos.
+- Build incremental: .build_cache.json guarda por página cuándo se generó y el tamaño/mtime con que
+  quedó su index.html. La página se omite si su index.html sigue igual y ninguna entrada (textos,
+  imágenes, catálogo, excels/maps, sus directorios y este script) se modificó o desapareció desde
+  entonces; y solo se reescribe si el HTML cambió (si no, no se toca).
+  Si el mtime no basta (checkout de git, copias), un hash BLAKE2b de lo que entra a cada página
+  (textos, items, imágenes y este script), guardado en la misma caché junto al hash del HTML
+  escrito, evita volver a generarla mientras el index.html existente conserve ese hash.
+  Usa --force para regenerar todo.
 """
 
+import argparse
+import csv
+import filecmp
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-import pandas as pd
 import html
+import re
+import unicodedata
 
 # ---------- Config ----------
 ROOT = Path(".")
@@ -42,35 +61,126 @@ ESTAB_IMG  = ASSETS_IMG / "estab.jpg"  # opcional
 
 CATALOG_CSV = DATA / "municipalidades_catalog.csv"
 
+# Imágenes disponibles: ruta POSIX si existe, None si no. Se evalúa al importar y se refresca
+# una vez por build desde main(), no en cada página.
+_ASSET_SRC = {}
+
+def _refresh_asset_existence():
+    _ASSET_SRC.update({p: (p.as_posix() if p.exists() else None)
+                       for p in (LOGO_PATH, HOME_IMG, ZONAS_IMG, INTER_IMG, ESTAB_IMG)})
+
+_refresh_asset_existence()
+
 ZONAS_DIR = ROOT / "ZonasEscolares"
 INTER_DIR = ROOT / "Intersecciones"
 ESTAB_DIR = ROOT / "EstablecimientoSalud"
 
+BUILD_CACHE = ROOT / ".build_cache.json"  # hash de entradas por página (ver _build_page)
+
 HOME_HTML  = ROOT / "index.html"
 ZONAS_HTML = ZONAS_DIR / "index.html"
 INTER_HTML = INTER_DIR / "index.html"
 ESTAB_HTML = ESTAB_DIR / "index.html"
 
 # ---------- Util ----------
+@lru_cache(maxsize=None)
+def _read_txt_cached(path_str: str, mtime: float) -> str:
+    # La clave incluye el mtime: si el archivo cambia, se vuelve a leer.
+    return Path(path_str).read_text(encoding="utf-8").strip()
+
 def read_txt(path: Path, default: str = "") -> str:
     try:
-        if path.exists():
-            return path.read_text(encoding="utf-8").strip()
+        return _read_txt_cached(str(path), path.stat().st_mtime)
     except Exception:
-        pass
-    return default
+        return default
 
 def esc(s: str) -> str:
     return html.escape(s or "")
 
+def write_if_changed(path: Path, data, hasher=None) -> bool:
+    """
+    Escribe `data` (str o iterable de trozos str) en UTF-8, en streaming a un temporal, y solo
+    reemplaza `path` si el contenido difiere. Devuelve True si escribió. Si se pasa `hasher`
+    (hashlib), se actualiza con los bytes escritos.
+    """
+    chunks = (data,) if isinstance(data, str) else data
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        # Búfer de 64 KiB: las tarjetas son trozos pequeños; se vuelcan en pocas llamadas a write().
+        with tmp.open("wb", buffering=1 << 16) as fp:
+            for chunk in chunks:
+                b = chunk.encode("utf-8")
+                fp.write(b)
+                if hasher is not None:
+                    hasher.update(b)
+        if path.exists() and filecmp.cmp(tmp, path, shallow=False):
+            tmp.unlink()  # mismo contenido: no se toca (ni su mtime) para rsync/CDN
+            return False
+        os.replace(tmp, path)
+        return True
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+# Margen para el reloj grueso de los sistemas de archivos: una entrada modificada poco antes del
+# build se vuelve a revisar (por hash) en el siguiente, en vez de darse por vista.
+_MTIME_SLACK = 2.0
+
+def is_up_to_date(out_path: Path, inputs, entry: dict) -> bool:
+    """
+    True si `out_path` es el mismo archivo que dejó el último build (tamaño y mtime guardados en
+    `entry`, su registro en la caché) y ninguna entrada cambió desde entonces: todas existen,
+    salvo las que ya faltaban en ese build, y ninguna tiene mtime >= su hora de inicio.
+    """
+    if not entry or "stamp" not in entry:
+        return False
+    try:
+        st = out_path.stat()
+    except OSError:
+        return False
+    if [st.st_size, st.st_mtime_ns] != entry.get("stat"):
+        return False
+    limit = entry["stamp"] - _MTIME_SLACK
+    missing = set(entry.get("missing", ()))
+    for p in (*inputs, *map(Path, entry.get("deps", ()))):
+        was_missing = p.as_posix() in missing
+        try:
+            mtime = p.stat().st_mtime
+        except OSError:
+            if was_missing:
+                continue
+            return False  # entrada eliminada
+        if was_missing or mtime >= limit:
+            return False
+    return True
+
+def _section_inputs(section_dir: Path, *extra: Path) -> list:
+    # Entradas de una sección: script, logo, extras y excels/maps. Incluye los directorios
+    # (content/, assets/img, excels/, maps/) para detectar archivos eliminados.
+    inputs = [Path(__file__), LOGO_PATH, CONTENT, ASSETS_IMG, *extra]
+    for sub, suffix in (("excels", ".xlsx"), ("maps", ".html")):
+        d = section_dir / sub
+        if d.exists():
+            inputs.append(d)
+            inputs.extend(d.glob(f"*{suffix}"))
+    return inputs
+
 def ensure_dirs():
     ZONAS_DIR.mkdir(parents=True, exist_ok=True)
     INTER_DIR.mkdir(parents=True, exist_ok=True)
     ESTAB_DIR.mkdir(parents=True, exist_ok=True)
 
-def css_block():
-    # Parche: imágenes hero SIN recorte + estilos del filtro y botones.
-    return """
+# Parche: imágenes hero SIN recorte + estilos del filtro y botones.
+# Las plantillas se escriben indentadas para leerlas aquí, pero se compactan una vez al cargar
+# el módulo: cada salto de línea con su sangría queda en un solo "\n" (mismo render, ~15-20% menos
+# de bytes por página) y se quitan los comentarios CSS.
+_COMPACT_WS_RE = re.compile(r"[ \t]*\n\s*")
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+
+def _compact(tmpl: str) -> str:
+    return _COMPACT_WS_RE.sub("\n", tmpl)
+
+_CSS_BLOCK = _compact(_CSS_COMMENT_RE.sub("", """
     <style>
       :root {
         --blue:#1d4ed8; --sky:#7dd3fc; --bg:#f7f7fb; --fg:#111827;
@@ -115,6 +225,7 @@ def css_block():
         background:#fff; border-radius:14px; padding:14px;
         box-shadow:0 4px 12px rgba(0,0,0,0.06);
       }
+      .card.hidden { display:none; }
       .card h3 { margin:4px 0 10px; font-size:18px; }
       .card .row { display:flex; gap:10px; }
       .card a, .card span.btn-like {
@@ -160,10 +271,13 @@ def css_block():
         .logo { height:40px; top:10px; }
       }
     </style>
-    """
+    """))
+
+_FOOTER = "<footer>PI 2026 · Dirección de Seguridad Vial — Generado automáticamente</footer>"
 
 def header_block(title_text: str, base_prefix: str = "") -> str:
-    logo_html = f'<img class="logo" src="{base_prefix}{LOGO_PATH.as_posix()}" alt="logo">' if LOGO_PATH.exists() else ""
+    logo_src = _ASSET_SRC.get(LOGO_PATH)
+    logo_html = f'<img class="logo" src="{base_prefix}{logo_src}" alt="logo">' if logo_src else ""
     return f"""
     <header>
       {logo_html}
@@ -174,12 +288,12 @@ def header_block(title_text: str, base_prefix: str = "") -> str:
     """
 
 def hero_img_html(base_prefix: str, path: Path, alt: str) -> str:
-    return f'<img class="hero" src="{base_prefix}{path.as_posix()}" alt="{esc(alt)}">' if path.exists() else ""
+    src = _ASSET_SRC.get(path)
+    return f'<img class="hero" src="{base_prefix}{src}" alt="{esc(alt)}">' if src else ""
 
 # ---------- Filtros (UI + JS) ----------
-def filters_block() -> str:
-    # Script espera DOMContentLoaded y recoge tarjetas en cada acción.
-    return """
+# Script espera DOMContentLoaded e indexa las tarjetas una sola vez.
+_FILTERS_BLOCK = _compact("""
     <div class="filters">
       <label>Departamento</label>
       <input id="f_dep" type="text" placeholder="Ejem: Lima">
@@ -201,26 +315,22 @@ def filters_block() -> str:
         function norm(s){
           return (s || '').toLowerCase().replace(/\\s+|_/g, '');
         }
-        function getCards(){
-          var grid = document.querySelector('.grid');
-          return grid ? Array.from(grid.querySelectorAll('.card')) : [];
+        // data-dep/prov/dist/ubi llegan normalizados desde build_site.py; se leen una sola vez.
+        function indexCard(card){
+          return {
+            el: card,
+            d: card.getAttribute('data-dep')  || '',
+            p: card.getAttribute('data-prov') || '',
+            t: card.getAttribute('data-dist') || '',
+            u: card.getAttribute('data-ubi')  || ''
+          };
         }
-        function ensureNormalizedAttrs(card){
-          ['data-dep','data-prov','data-dist','data-ubi'].forEach(function(attr){
-            var v = card.getAttribute(attr) || '';
-            card.setAttribute(attr, norm(v));
-          });
-        }
-        function matchCard(card, q){
-          var d = card.getAttribute('data-dep')  || '';
-          var p = card.getAttribute('data-prov') || '';
-          var t = card.getAttribute('data-dist') || '';
-          var u = card.getAttribute('data-ubi')  || '';
+        function matchCard(rec, q){
           var ok = true;
-          if(q.dep  && d.indexOf(q.dep)  === -1) ok = false;
-          if(q.prov && p.indexOf(q.prov) === -1) ok = false;
-          if(q.dist && t.indexOf(q.dist) === -1) ok = false;
-          if(q.ubi  && u.indexOf(q.ubi)  === -1) ok = false;
+          if(q.dep  && rec.d.indexOf(q.dep)  === -1) ok = false;
+          if(q.prov && rec.p.indexOf(q.prov) === -1) ok = false;
+          if(q.dist && rec.t.indexOf(q.dist) === -1) ok = false;
+          if(q.ubi  && rec.u.indexOf(q.ubi)  === -1) ok = false;
           return ok;
         }
         function queryValues(){
@@ -235,28 +345,30 @@ def filters_block() -> str:
           var applyBtn = document.getElementById('f_apply');
           var topBtn   = document.getElementById('f_top');
           var clearBtn = document.getElementById('f_clear');
+          // Índice de tarjetas (en su orden original): se arma una vez, no en cada acción.
+          var grid  = document.querySelector('.grid');
+          var cards = grid ? Array.from(grid.querySelectorAll('.card')).map(indexCard) : [];
 
           function applyHide(){
             var q = queryValues();
-            var cards = getCards();
-            cards.forEach(ensureNormalizedAttrs);
-            cards.forEach(function(card){
-              card.style.display = matchCard(card, q) ? '' : 'none';
+            cards.forEach(function(rec){
+              rec.el.classList.toggle('hidden', !matchCard(rec, q));
             });
           }
 
           function bringTop(){
             var q = queryValues();
-            var grid = document.querySelector('.grid');
             if(!grid) return;
-            var cards = getCards();
-            cards.forEach(ensureNormalizedAttrs);
             var matches = [], rest = [];
-            cards.forEach(function(card){
-              (matchCard(card, q) ? matches : rest).push(card);
-              card.style.display = ''; // mostrar todos, solo reordenar
+            cards.forEach(function(rec){
+              (matchCard(rec, q) ? matches : rest).push(rec.el);
+              rec.el.classList.remove('hidden'); // mostrar todos, solo reordenar
             });
-            matches.concat(rest).forEach(function(card){ grid.appendChild(card); });
+            // Reordenar fuera del documento y reinsertar de una vez (un solo reflow).
+            var frag = document.createDocumentFragment();
+            matches.forEach(function(card){ frag.appendChild(card); });
+            rest.forEach(function(card){ frag.appendChild(card); });
+            grid.appendChild(frag);
           }
 
           function clearAll(){
@@ -265,7 +377,7 @@ def filters_block() -> str:
             var dist = document.getElementById('f_dist');
             var ubi  = document.getElementById('f_ubi');
             dep.value = prov.value = dist.value = ubi.value = '';
-            getCards().forEach(function(card){ card.style.display = ''; });
+            cards.forEach(function(rec){ rec.el.classList.remove('hidden'); });
           }
 
           applyBtn.addEventListener('click', applyHide);
@@ -279,143 +391,108 @@ def filters_block() -> str:
         });
       })();
     </script>
-    """
+    """)
 
 # ---------- HTML pages ----------
-def home_html(title_text: str, body_text: str) -> str:
-    base = ""  # raíz
-    hero_html = hero_img_html(base, HOME_IMG, "imagen")
-    return f"""
+# Esqueletos de página: literales definidos una sola vez a nivel de módulo y completados
+# con str.format (los valores llegan ya escapados).
+_HOME_PAGE = _compact("""
     <!doctype html><html lang="es"><head>
       <meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
-      <title>{esc(title_text)}</title>
-      {css_block()}
+      <title>{title}</title>
+      {css}
     </head><body>
-      {header_block(title_text, base_prefix=base)}
+      {header}
       <div class="container">
-        <p>{esc(body_text)}</p>
-        <div style="margin:14px 0 18px;">{hero_html}</div>
+        <p>{body}</p>
+        <div style="margin:14px 0 18px;">{hero}</div>
         <div class="buttons">
           <a class="btn zonas" href="ZonasEscolares/index.html">Zonas Escolares</a>
           <a class="btn inter" href="Intersecciones/index.html">Intersecciones</a>
           <a class="btn estab" href="EstablecimientoSalud/index.html">Establecimientos de Salud</a>
         </div>
       </div>
-      <footer>PI 2026 · Dirección de Seguridad Vial — Generado automáticamente</footer>
+      {footer}
     </body></html>
-    """
+    """)
 
-def zonas_html(title_text: str, body_text: str, items: list) -> str:
-    base = "../"  # /ZonasEscolares/
-    hero_html = hero_img_html(base, ZONAS_IMG, "zonas")
-    cards = []
-    for it in items:
-        titulo    = esc(it.get("titulo") or it.get("slug") or it.get("ubigeo") or "")
-        excel_rel = it.get("excel_rel") or "#"
-        mapa_rel  = it.get("mapa_rel")  or "#"
-        has_excel = bool(it.get("has_excel"))
-        has_map   = bool(it.get("has_map"))
-
-        data_dep  = esc(it.get("data_dep",""))
-        data_prov = esc(it.get("data_prov",""))
-        data_dist = esc(it.get("data_dist",""))
-        data_ubi  = esc(it.get("data_ubi",""))
-
-        excel_btn = (f'<a class="dl" href="{excel_rel}" download>Descargar Excel</a>'
-                     if has_excel else '<span class="btn-like disabled">Sin Excel</span>')
-        map_btn   = (f'<a class="map" href="{mapa_rel}" target="_blank" rel="noopener">Abrir mapa</a>'
-                     if has_map else '<span class="btn-like disabled">Mapa no disponible</span>')
-
-        detail_html = f'<div class="muted">UBIGEO: {data_ubi}</div>' if data_ubi else ''
-
-        cards.append(f"""
-          <div class="card" data-dep="{data_dep}" data-prov="{data_prov}" data-dist="{data_dist}" data-ubi="{data_ubi}">
-            <h3>{titulo}</h3>
-            <div class="row">
-              {excel_btn}
-              {map_btn}
-            </div>
-            {detail_html}
-          </div>
-        """)
-    cards_html = "\n".join(cards)
-    return f"""
+_SECTION_PAGE = _compact("""
     <!doctype html><html lang="es"><head>
       <meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
-      <title>{esc(title_text)}</title>
-      {css_block()}
+      <title>{title}</title>
+      {css}
     </head><body>
       <a class="back" href="../index.html">← Regresar</a>
-      {header_block(title_text, base_prefix=base)}
+      {header}
       <div class="container">
-        <p>{esc(body_text)}</p>
-        <div style="margin:14px 0 18px;">{hero_html}</div>
+        <p>{body}</p>
+        <div style="margin:14px 0 18px;">{hero}</div>
 
-        {filters_block()}
+        {filters}
 
         <div class="grid">
-          {cards_html}
+          {cards}
         </div>
       </div>
-      <footer>PI 2026 · Dirección de Seguridad Vial — Generado automáticamente</footer>
+      {footer}
     </body></html>
-    """
+    """)
 
-def list_page_html(title_text: str, body_text: str, items: list, hero_img_path: Path, base="../"):
-    hero_html = hero_img_html(base, hero_img_path, "imagen")
-    cards = []
-    for it in items:
-        titulo    = esc(it.get("titulo") or it.get("slug") or it.get("ubigeo") or it.get("name") or "")
-        excel_rel = it.get("excel_rel") or "#"
-        mapa_rel  = it.get("mapa_rel")  or "#"
-        has_excel = bool(it.get("has_excel"))
-        has_map   = bool(it.get("has_map"))
-
-        data_dep  = esc(it.get("data_dep",""))
-        data_prov = esc(it.get("data_prov",""))
-        data_dist = esc(it.get("data_dist",""))
-        data_ubi  = esc(it.get("data_ubi",""))  # ahora poblado desde catálogo
-
-        excel_btn = (f'<a class="dl" href="{excel_rel}" download>Descargar Excel</a>'
-                     if has_excel else '<span class="btn-like disabled">Sin Excel</span>')
-        map_btn   = (f'<a class="map" href="{mapa_rel}" target="_blank" rel="noopener">Abrir mapa</a>'
-                     if has_map else '<span class="btn-like disabled">Mapa no disponible</span>')
-
-        # << NUEVO >> Mostrar UBIGEO en la tarjeta (igual que Zonas)
-        detail_html = f'<div class="muted">UBIGEO: {data_ubi}</div>' if data_ubi else ''
-
-        cards.append(f"""
-          <div class="card" data-dep="{data_dep}" data-prov="{data_prov}" data-dist="{data_dist}" data-ubi="{data_ubi}">
+# Tarjeta de un item y sus botones: literales de módulo, solo se completan los valores.
+_CARD_TMPL = _compact("""
+          <div class="card" data-dep="{dep}" data-prov="{prov}" data-dist="{dist}" data-ubi="{ubi}">
             <h3>{titulo}</h3>
             <div class="row">
               {excel_btn}
               {map_btn}
             </div>
-            {detail_html}
+            {detail}
           </div>
         """)
-    cards_html = "\n".join(cards)
-    return f"""
-    <!doctype html><html lang="es"><head>
-      <meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
-      <title>{esc(title_text)}</title>
-      {css_block()}
-    </head><body>
-      <a class="back" href="../index.html">← Regresar</a>
-      {header_block(title_text, base_prefix=base)}
-      <div class="container">
-        <p>{esc(body_text)}</p>
-        <div style="margin:14px 0 18px;">{hero_html}</div>
+# Botones: las variantes deshabilitadas son constantes; las que llevan href, métodos .format ya ligados.
+_EXCEL_BTN     = '<a class="dl" href="{}" download>Descargar Excel</a>'.format
+_EXCEL_BTN_OFF = '<span class="btn-like disabled">Sin Excel</span>'
+_MAP_BTN       = '<a class="map" href="{}" target="_blank" rel="noopener">Abrir mapa</a>'.format
+_MAP_BTN_OFF   = '<span class="btn-like disabled">Mapa no disponible</span>'
+_DETAIL        = '<div class="muted">{}</div>'.format
+_CARD          = _CARD_TMPL.format
+
+def _card_html(it: dict) -> str:
+    # Los campos de texto del item llegan ya escapados desde load_catalog_zonas/_scan_items_generic.
+    return _CARD(
+        dep=it.get("data_dep",""),
+        prov=it.get("data_prov",""),
+        dist=it.get("data_dist",""),
+        ubi=it.get("data_ubi",""),
+        titulo=it.get("titulo") or it.get("slug") or it.get("ubigeo") or it.get("name") or "",
+        excel_btn=_EXCEL_BTN(it.get("excel_rel") or "#") if it.get("has_excel") else _EXCEL_BTN_OFF,
+        map_btn=_MAP_BTN(it.get("mapa_rel") or "#") if it.get("has_map") else _MAP_BTN_OFF,
+        detail=_DETAIL(it["detalle"]) if it.get("detalle") else "",
+    )
+
+_SECTION_HEAD, _SECTION_TAIL = _SECTION_PAGE.split("{cards}")
 
-        {filters_block()}
+def home_html(title_text: str, body_text: str) -> str:
+    base = ""  # raíz
+    hero_html = hero_img_html(base, HOME_IMG, "imagen")
+    return _HOME_PAGE.format(
+        title=esc(title_text), css=_CSS_BLOCK, header=header_block(title_text, base_prefix=base),
+        body=esc(body_text), hero=hero_html, footer=_FOOTER,
+    )
 
-        <div class="grid">
-          {cards_html}
-        </div>
-      </div>
-      <footer>PI 2026 · Dirección de Seguridad Vial — Generado automáticamente</footer>
-    </body></html>
+def iter_section_html(title_text: str, body_text: str, items, hero_img_path: Path,
+                      hero_alt: str = "imagen", base: str = "../"):
+    """
+    Página de sección (Zonas/Inter/Estab) por trozos: cabecera, una tarjeta por item y pie,
+    para escribirla en streaming sin armar el documento completo en memoria.
     """
+    yield _SECTION_HEAD.format(
+        title=esc(title_text), css=_CSS_BLOCK, header=header_block(title_text, base_prefix=base),
+        body=esc(body_text), hero=hero_img_html(base, hero_img_path, hero_alt), filters=_FILTERS_BLOCK,
+    )
+    for i, it in enumerate(items):
+        yield "\n" + _card_html(it) if i else _card_html(it)
+    yield _SECTION_TAIL.format(footer=_FOOTER)
 
 # ---------- Normalización / helpers ----------
 def _split_slug(name: str):
@@ -433,110 +510,160 @@ def _norm_for_key(s: str) -> str:
 def _key_from_parts(dep: str, prov: str, dist: str) -> str:
     return "|".join([_norm_for_key(dep), _norm_for_key(prov), _norm_for_key(dist)])
 
+_FILTER_NORM_RE = re.compile(r"\s+|_")
+
+def _filter_attr(s: str) -> str:
+    # Valor de data-* para los filtros: ya normalizado como norm() del JS (minúsculas, sin
+    # espacios ni "_") y escapado, así el navegador no tiene que normalizar tarjeta por tarjeta.
+    return html.escape(_FILTER_NORM_RE.sub("", (s or "").lower()))
+
+# ---------- Lectura del catálogo ----------
+_CATALOG_LOCK = threading.Lock()
+# Únicas columnas que usa el sitio (Zonas + índices UBIGEO); el resto se descarta al leer.
+_CATALOG_COLS = ("ubigeo", "slug", "excel_relpath", "departamento", "provincia", "distrito")
+
+def read_catalog() -> list:
+    """
+    Lee el catálogo con csv de la librería estándar: lista de dicts con las columnas de
+    _CATALOG_COLS, todo texto y "" donde falte. Se parsea una sola vez por proceso.
+    """
+    with _CATALOG_LOCK:  # zonas/inter/estab leen en paralelo
+        return _read_catalog_cached()
+
+@lru_cache(maxsize=1)
+def _read_catalog_cached() -> list:
+    with CATALOG_CSV.open(newline="", encoding="utf-8-sig") as f:
+        return [{c: (r.get(c) or "") for c in _CATALOG_COLS} for r in csv.DictReader(f)]
+
 # ---------- Índices de catálogo para UBIGEO ----------
+_INDEX_LOCK = threading.Lock()
+
 def _load_catalog_index():
     """
     Devuelve dos índices:
       - idx_slug:   { slug_lower : ubigeo }
       - idx_parts:  { "dep|prov|dist" (normalizado) : ubigeo }
+    Se construyen una sola vez por proceso y se comparten entre Inter y Estab (solo lectura).
     """
+    with _INDEX_LOCK:  # inter/estab corren en paralelo: que solo uno construya el índice
+        return _build_catalog_index()
+
+@lru_cache(maxsize=1)
+def _build_catalog_index():
     if not CATALOG_CSV.exists():
         return {}, {}
-    df = pd.read_csv(CATALOG_CSV, dtype=str).fillna("")
-    if "slug" not in df.columns:
-        df["slug"] = ""
-    if "ubigeo" not in df.columns:
-        df["ubigeo"] = ""
-
     idx_slug = {}
     idx_parts = {}
-    for _, r in df.iterrows():
-        slug = (r.get("slug") or "").strip()
-        ubi  = (r.get("ubigeo") or "").strip()
+    for r in read_catalog():
+        slug = r["slug"].strip()
+        ubi  = r["ubigeo"].strip()
         if slug:
             idx_slug[slug.lower()] = ubi
-            dep, prov, dist = _split_slug(slug)
-            key = _key_from_parts(dep, prov, dist)
-            idx_parts[key] = ubi
+            idx_parts[_key_from_parts(*_split_slug(slug))] = ubi
         else:
             # Si no hay slug, intenta con columnas depart/prov/dist si existen
-            dep = (r.get("departamento") or "").strip()
-            prov = (r.get("provincia") or "").strip()
-            dist = (r.get("distrito") or "").strip()
-            if any([dep, prov, dist]):
-                key = _key_from_parts(dep, prov, dist)
-                idx_parts[key] = ubi
+            dep, prov, dist = r["departamento"].strip(), r["provincia"].strip(), r["distrito"].strip()
+            if dep or prov or dist:
+                idx_parts[_key_from_parts(dep, prov, dist)] = ubi
     return idx_slug, idx_parts
 
+# ---------- Existencia de archivos por listado de directorio ----------
+def _list_names(d: Path) -> frozenset:
+    """Nombres de las entradas de `d` (una sola lectura del directorio); vacío si no existe."""
+    try:
+        with os.scandir(d) as it:
+            return frozenset(e.name for e in it)
+    except OSError:
+        return frozenset()
+
+def _exists_rel(relpath: str, prefix: str, names: frozenset) -> bool:
+    """
+    Existencia de una ruta relativa a ROOT. Si está directamente bajo `prefix` se resuelve
+    contra `names` (listado de ese directorio); si no (ruta personalizada del catálogo),
+    con Path.exists().
+    """
+    if not relpath:
+        return False
+    if relpath.startswith(prefix):
+        tail = relpath[len(prefix):]
+        if "/" not in tail:
+            return tail in names
+    return (ROOT / Path(relpath)).exists()
+
+@lru_cache(maxsize=4096)
+def _nfkd(s: str) -> str:
+    # Clave de orden: Ñ/tildes junto a su letra base. Departamentos/provincias se repiten mucho.
+    return unicodedata.normalize("NFKD", s)
+
+def _rel_from_section(relpath: str) -> str:
+    # Ruta relativa a /ZonasEscolares/: separador "/" y prefijo "../".
+    rel = relpath.replace("\\", "/")
+    rel = rel[2:] if rel.startswith("./") else rel
+    return rel if rel.startswith("../") else "../" + rel
+
 # ---------- Carga catálogo & prepara items (ZONAS) ----------
+def _map_rel(excel: str) -> str:
+    # Mapa de un Excel de Zonas: misma ruta con /maps/ y .html
+    return (excel.replace("/excels/", "/maps/")
+                 .replace("\\excels\\", "\\maps\\")
+                 .replace(".xlsx", ".html"))
+
+def _zonas_extra_inputs() -> list:
+    """
+    Rutas personalizadas del catálogo (excel_relpath fuera de ZonasEscolares/excels/) y sus
+    mapas, con sus directorios: no están en los listados que vigila _section_inputs.
+    """
+    deps = set()
+    for r in read_catalog():
+        excel = r["excel_relpath"]
+        if not excel:
+            continue
+        for rel, prefix in ((excel, "ZonasEscolares/excels/"), (_map_rel(excel), "ZonasEscolares/maps/")):
+            if not rel.startswith(prefix) or "/" in rel[len(prefix):]:
+                p = ROOT / Path(rel)
+                deps.update((p, p.parent))
+    return sorted(deps)
+
 def load_catalog_zonas():
     if not CATALOG_CSV.exists():
         raise FileNotFoundError(f"No se encuentra {CATALOG_CSV}")
-    df = pd.read_csv(CATALOG_CSV, dtype=str).fillna("")
-    for c in ["ubigeo", "slug", "excel_relpath", "departamento", "provincia", "distrito"]:
-        if c not in df.columns: df[c] = ""
-
-    def guess_excel(row):
-        if row["excel_relpath"]:
-            return row["excel_relpath"]
-        name = row["slug"] or row["ubigeo"] or "SIN_NOMBRE"
-        return f"ZonasEscolares/excels/{name}.xlsx"
-    df["excel_relpath"] = df.apply(guess_excel, axis=1)
-
-    def to_map(p):
-        if not p: return ""
-        return p.replace("/excels/", "/maps/").replace("\\excels\\", "\\maps\\").replace(".xlsx", ".html")
-    df["map_relpath"] = df["excel_relpath"].map(to_map)
-
-    def exists_rel(relpath: str) -> bool:
-        if not relpath: return False
-        return (ROOT / Path(relpath)).exists()
-
-    df["has_excel"] = df["excel_relpath"].map(exists_rel)
-    df["has_map"]   = df["map_relpath"].map(exists_rel)
-
-    df = df[df["has_excel"]].copy()
-
-    def mk_title(row):
-        parts = [row.get("departamento","").strip(), row.get("provincia","").strip(), row.get("distrito","").strip()]
-        parts = [p for p in parts if p]
-        if parts: return " - ".join(parts)
-        if row.get("slug"): return row["slug"].replace("_", " ")
-        return row.get("ubigeo", "")
-    df["title"] = df.apply(mk_title, axis=1)
-
-    # Ordenamiento
-    df["_dep"]  = df["departamento"].str.normalize('NFKD')
-    df["_prov"] = df["provincia"].str.normalize('NFKD')
-    df["_dist"] = df["distrito"].str.normalize('NFKD')
-    df["_slug"] = df["slug"].str.normalize('NFKD')
-    df = df.sort_values(["_dep","_prov","_dist","_slug","ubigeo"])
+    excel_names = _list_names(ZONAS_DIR / "excels")
+    map_names   = _list_names(ZONAS_DIR / "maps")
 
-    items = []
-    for _, r in df.iterrows():
-        excel_rel = Path(r["excel_relpath"]).as_posix()
-        mapa_rel  = Path(r["map_relpath"]).as_posix()
-        if not excel_rel.startswith("../"):
-            excel_rel = f"../{excel_rel}"
-        if not mapa_rel.startswith("../"):
-            mapa_rel = f"../{mapa_rel}"
+    rows = []
+    for r in read_catalog():
+        # Excel por defecto: ZonasEscolares/excels/<slug | ubigeo | SIN_NOMBRE>.xlsx
+        excel = r["excel_relpath"] or f"ZonasEscolares/excels/{r['slug'] or r['ubigeo'] or 'SIN_NOMBRE'}.xlsx"
+        # Solo se listan filas cuyo Excel exista (un listado por directorio, sin stat() por fila).
+        if not _exists_rel(excel, "ZonasEscolares/excels/", excel_names):
+            continue
+        rows.append((r, excel, _map_rel(excel)))
 
-        sugg = r.get("slug") or f"{r.get('departamento','')}-{r.get('provincia','')}-{r.get('distrito','')}"
-        dep, prov, dist = _split_slug(sugg)
+    # Ordenamiento (NFKD: Ñ/tildes junto a su letra base)
+    rows.sort(key=lambda t: tuple(_nfkd(t[0][c]) for c in ("departamento", "provincia", "distrito", "slug", "ubigeo")))
 
+    items = []
+    for r, excel, mapa in rows:
+        slug, ubigeo = r["slug"], r["ubigeo"]
+        # Título: "DEP - PROV - DIST" (omitiendo vacíos); si no hay partes, slug y luego ubigeo.
+        parts = [p for p in (r["departamento"].strip(), r["provincia"].strip(), r["distrito"].strip()) if p]
+        title = " - ".join(parts) or slug.replace("_", " ") or ubigeo
+        # Partes para los filtros: del slug (o "dep-prov-dist" si falta), como _split_slug.
+        dep, prov, dist = _split_slug(slug or f"{r['departamento']}-{r['provincia']}-{r['distrito']}")
+        # Campos de texto ya escapados para HTML.
         items.append({
-            "titulo": r["title"],
-            "slug": r["slug"],
-            "ubigeo": r["ubigeo"],
-            "excel_rel": excel_rel,
-            "mapa_rel": mapa_rel,
-            "has_excel": bool(r["has_excel"]),
-            "has_map":   bool(r["has_map"]),
-            "detalle": f"UBIGEO: {r['ubigeo']}" if r["ubigeo"] else "",
-            "data_dep":  dep,
-            "data_prov": prov,
-            "data_dist": dist,
-            "data_ubi":  r.get("ubigeo","") or "",
+            "titulo":    html.escape(title),
+            "slug":      html.escape(slug),
+            "ubigeo":    html.escape(ubigeo),
+            "excel_rel": _rel_from_section(excel),
+            "mapa_rel":  _rel_from_section(mapa),
+            "has_excel": True,
+            "has_map":   _exists_rel(mapa, "ZonasEscolares/maps/", map_names),
+            "detalle":   f"UBIGEO: {html.escape(ubigeo)}" if ubigeo else "",
+            "data_dep":  _filter_attr(dep),
+            "data_prov": _filter_attr(prov),
+            "data_dist": _filter_attr(dist),
+            "data_ubi":  _filter_attr(ubigeo),
         })
     return items
 
@@ -550,38 +677,46 @@ def _scan_items_generic(base_dir: Path, section: str, idx_slug: dict, idx_parts:
     """
     excels_dir = base_dir / "excels"
     items = []
-    if excels_dir.exists():
-        for x in sorted(excels_dir.glob("*.xlsx")):
-            name = x.stem  # p.ej. DEPARTAMENTO-PROVINCIA-DISTRITO (con _ en el distrito)
-            excel_rel = f"../{section}/excels/{x.name}"
-            mapa_rel  = f"../{section}/maps/{name}.html"
-            has_excel = True
-            has_map   = (ROOT / section / "maps" / f"{name}.html").exists()
-            titulo = name.replace("_", " ")
-
-            dep, prov, dist = _split_slug(name)
-
-            # UBIGEO desde catálogo
-            ubi = ""
-            slug_lower = name.lower()
-            if slug_lower in idx_slug:
-                ubi = idx_slug[slug_lower]
-            else:
-                key = _key_from_parts(dep, prov, dist)
-                ubi = idx_parts.get(key, "")
-
-            items.append({
-                "titulo": titulo,
-                "name": name,
-                "excel_rel": excel_rel,
-                "mapa_rel":  mapa_rel,
-                "has_excel": has_excel,
-                "has_map":   has_map,
-                "data_dep":  dep,
-                "data_prov": prov,
-                "data_dist": dist,
-                "data_ubi":  ubi,   # <- ahora poblado
-            })
+    # Un listado por directorio: nombres de excels y mapas existentes (sin stat() por item).
+    try:
+        with os.scandir(excels_dir) as it:
+            # is_file() usa el tipo que trae el DirEntry: sin stat() extra por entrada.
+            xlsx_names = sorted(e.name for e in it if e.name.endswith(".xlsx") and e.is_file())
+    except OSError:
+        return items
+    map_names = _list_names(base_dir / "maps")
+
+    for fname in xlsx_names:
+        name = fname[:-5]  # p.ej. DEPARTAMENTO-PROVINCIA-DISTRITO (con _ en el distrito)
+        excel_rel = f"../{section}/excels/{fname}"
+        mapa_rel  = f"../{section}/maps/{name}.html"
+        has_excel = True
+        has_map   = f"{name}.html" in map_names
+        dep, prov, dist = _split_slug(name)
+
+        # UBIGEO desde catálogo
+        ubi = ""
+        slug_lower = name.lower()
+        if slug_lower in idx_slug:
+            ubi = idx_slug[slug_lower]
+        else:
+            key = _key_from_parts(dep, prov, dist)
+            ubi = idx_parts.get(key, "")
+
+        # Campos de texto ya escapados para HTML (igual que en Zonas).
+        items.append({
+            "titulo": html.escape(name.replace("_", " ")),
+            "name": html.escape(name),
+            "excel_rel": excel_rel,
+            "mapa_rel":  mapa_rel,
+            "has_excel": has_excel,
+            "has_map":   has_map,
+            "data_dep":  _filter_attr(dep),
+            "data_prov": _filter_attr(prov),
+            "data_dist": _filter_attr(dist),
+            "data_ubi":  _filter_attr(ubi),   # <- ahora poblado
+            "detalle":   f"UBIGEO: {html.escape(ubi)}" if ubi else "",
+        })
     return items
 
 def load_items_inter():
@@ -593,39 +728,148 @@ def load_items_estab():
     return _scan_items_generic(ESTAB_DIR, "EstablecimientoSalud", idx_slug, idx_parts)
 
 # ---------- Build ----------
-def build_home():
+# Las cuatro páginas se generan en paralelo (hilos): no comparten estado mutable y
+# escriben archivos distintos.
+_PRINT_LOCK = threading.Lock()
+
+def _report(path: Path, written: bool, extra: str = ""):
+    tag = "[OK]" if written else "[SKIP]"
+    note = extra if written else " (sin cambios)"
+    with _PRINT_LOCK:
+        print(f"{tag} {path.resolve()}{note}")
+
+# Caché del build, una entrada por página: hora de inicio y tamaño/mtime del HTML para el chequeo
+# por mtime, y los hashes de entradas y del HTML escrito como respaldo cuando git o una copia cambian las fechas sin
+# cambiar los datos.
+_BUILD_CACHE_LOCK = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _script_digest() -> bytes:
+    # La "versión" de las plantillas: cualquier cambio en este script invalida la caché.
+    return hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).digest()
+
+def _page_digest(*parts) -> str:
+    h = hashlib.blake2b(_script_digest(), digest_size=16)
+    h.update(json.dumps([sorted((str(k), v) for k, v in _ASSET_SRC.items()), *parts],
+                        ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def _file_digest(path: Path):
+    # Hash de un HTML ya escrito (None si no existe): detecta ediciones a mano o escrituras truncas.
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+def _read_build_cache() -> dict:
+    try:
+        return json.loads(BUILD_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def _cache_entry(out: Path) -> dict:
+    with _BUILD_CACHE_LOCK:
+        entry = _read_build_cache().get(out.as_posix())
+    return entry if isinstance(entry, dict) else {}
+
+def _build_page(out: Path, force: bool, stamp: float, inputs, parts: tuple, render,
+                extra: str = "", deps=()):
+    """
+    Genera `out` con `render()` salvo que el hash de `parts` coincida con el guardado para esa
+    página y `out` tenga el hash de los bytes que se escribieron entonces. Con --force siempre se regenera. En ambos casos registra en la
+    caché `stamp` (hora de inicio, antes de leer las entradas), el tamaño/mtime de `out`, las
+    entradas que faltan y `deps` (entradas descubiertas al generar) para el chequeo por mtime.
+    """
+    key = out.as_posix()
+    digest = _page_digest(*parts)
+    entry = _cache_entry(out)
+    if not force and entry.get("in") == digest and entry.get("out") == _file_digest(out):
+        written = False
+        out_digest = entry["out"]
+    else:
+        h = hashlib.blake2b(digest_size=16)
+        written = write_if_changed(out, render(), h)
+        out_digest = h.hexdigest()
+    st = out.stat()
+    deps = [p.as_posix() for p in deps]
+    entry = {
+        "in": digest,
+        "out": out_digest,
+        "stamp": stamp,
+        "stat": [st.st_size, st.st_mtime_ns],
+        "missing": sorted({p.as_posix() for p in inputs if not p.exists()}
+                          | {d for d in deps if not Path(d).exists()}),
+        "deps": deps,
+    }
+    with _BUILD_CACHE_LOCK:
+        cache = _read_build_cache()
+        cache[key] = entry
+        write_if_changed(BUILD_CACHE, json.dumps(cache, indent=1, sort_keys=True))
+    _report(out, written, extra)
+
+def build_home(force: bool = False):
+    inputs = [Path(__file__), LOGO_PATH, HOME_IMG, CONTENT, ASSETS_IMG,
+              CONTENT / "home_title.txt", CONTENT / "home_body.txt"]
+    if not force and is_up_to_date(HOME_HTML, inputs, _cache_entry(HOME_HTML)):
+        _report(HOME_HTML, False)
+        return
+    stamp = time.time()
     title = read_txt(CONTENT / "home_title.txt", "Programa de Incentivos 2026 — Observatorio de Seguridad Vial")
     body  = read_txt(CONTENT / "home_body.txt", "Bienvenido/a. Navega a las implementaciones y explora los recursos.")
-    HOME_HTML.write_text(home_html(title, body), encoding="utf-8")
-    print(f"[OK] {HOME_HTML.resolve()}")
-
-def build_zonas():
+    _build_page(HOME_HTML, force, stamp, inputs, (title, body), lambda: home_html(title, body))
+
+def build_zonas(force: bool = False):
+    inputs = _section_inputs(ZONAS_DIR, CATALOG_CSV, ZONAS_IMG,
+                             CONTENT / "zonas_title.txt", CONTENT / "zonas_body.txt")
+    if not force and is_up_to_date(ZONAS_HTML, inputs, _cache_entry(ZONAS_HTML)):
+        _report(ZONAS_HTML, False)
+        return
+    stamp = time.time()
     title = read_txt(CONTENT / "zonas_title.txt", "Zonas Escolares")
     body  = read_txt(CONTENT / "zonas_body.txt",  "Explora los recursos por municipalidad/distrito.")
     items = load_catalog_zonas()
-    ZONAS_HTML.write_text(zonas_html(title, body, items), encoding="utf-8")
-    print(f"[OK] {ZONAS_HTML.resolve()} (items: {len(items)})")
-
-def build_inter():
+    _build_page(ZONAS_HTML, force, stamp, inputs, (title, body, items),
+                lambda: iter_section_html(title, body, items, ZONAS_IMG, "zonas"), f" (items: {len(items)})",
+                deps=_zonas_extra_inputs())
+
+def build_inter(force: bool = False):
+    inputs = _section_inputs(INTER_DIR, CATALOG_CSV, INTER_IMG,
+                             CONTENT / "inter_title.txt", CONTENT / "inter_body.txt")
+    if not force and is_up_to_date(INTER_HTML, inputs, _cache_entry(INTER_HTML)):
+        _report(INTER_HTML, False)
+        return
+    stamp = time.time()
     title = read_txt(CONTENT / "inter_title.txt", "Intersecciones priorizadas")
     body  = read_txt(CONTENT / "inter_body.txt",  "Explora los recursos por municipalidad/distrito.")
     items = load_items_inter()
-    INTER_HTML.write_text(list_page_html(title, body, items, INTER_IMG), encoding="utf-8")
-    print(f"[OK] {INTER_HTML.resolve()} (items: {len(items)})")
-
-def build_estab():
+    _build_page(INTER_HTML, force, stamp, inputs, (title, body, items),
+                lambda: iter_section_html(title, body, items, INTER_IMG), f" (items: {len(items)})")
+
+def build_estab(force: bool = False):
+    inputs = _section_inputs(ESTAB_DIR, CATALOG_CSV, ESTAB_IMG,
+                             CONTENT / "estab_title.txt", CONTENT / "estab_body.txt")
+    if not force and is_up_to_date(ESTAB_HTML, inputs, _cache_entry(ESTAB_HTML)):
+        _report(ESTAB_HTML, False)
+        return
+    stamp = time.time()
     title = read_txt(CONTENT / "estab_title.txt", "Establecimientos de Salud priorizados")
     body  = read_txt(CONTENT / "estab_body.txt",  "Explora los recursos por municipalidad/distrito.")
     items = load_items_estab()
-    ESTAB_HTML.write_text(list_page_html(title, body, items, ESTAB_IMG), encoding="utf-8")
-    print(f"[OK] {ESTAB_HTML.resolve()} (items: {len(items)})")
+    _build_page(ESTAB_HTML, force, stamp, inputs, (title, body, items),
+                lambda: iter_section_html(title, body, items, ESTAB_IMG), f" (items: {len(items)})")
 
 def main():
+    ap = argparse.ArgumentParser(description="Generar el sitio estático (portada + secciones).")
+    ap.add_argument("--force", action="store_true", help="Regenerar todas las páginas aunque sus entradas no hayan cambiado.")
+    args = ap.parse_args()
+
     ensure_dirs()
-    build_home()
-    build_zonas()
-    build_inter()
-    build_estab()
+    _refresh_asset_existence()
+    builders = (build_home, build_zonas, build_inter, build_estab)
+    with ThreadPoolExecutor(max_workers=len(builders)) as ex:
+        futures = [ex.submit(b, args.force) for b in builders]
+        for fut in futures:
+            fut.result()  # propaga la primera excepción
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,511 @@
+# -*- coding: utf-8 -*-
+"""
+maps_common.py  (helpers compartidos por maps_establecimientos.py, maps_intersecciones.py y
+"maps_from_excels copy.py")
+- Índices de contornos (distritos/provincias) por UBIGEO y su poda a los Excel a procesar.
+- Punto en polígono vectorizado (NumPy, o numba si está instalado) y simplificación del contorno.
+- Región de cada mapa (contorno + siniestros dentro), memoizada por UBIGEO.
+- Lectura del CSV de siniestros como texto (pyarrow opcional) y de GeoJSON (orjson opcional).
+- Popups por columnas y capas de marcadores como JS Leaflet directo.
+- Datos compartidos de los workers del ProcessPoolExecutor.
+"""
+
+import csv
+from functools import lru_cache
+from pathlib import Path
+import json
+import numpy as np
+import pandas as pd
+import folium
+from html import escape
+from branca.element import Element, MacroElement
+
+try:  # opcional: compila el test de punto en polígono a código nativo
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:  # opcional: parser JSON en C, bastante más rápido con los GeoJSON grandes
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # opcional: parser CSV en C++ para el CSV de siniestros
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa_csv = None
+
+try:  # opcional: lector XLSX en Rust para pd.read_excel (si no, openpyxl)
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = None
+
+# ---------------- util ----------------
+def to_ubigeo6(x):
+    if x is None:
+        return None
+    s = str(x).strip()
+    if s.endswith(".0"):
+        s = s[:-2]
+    s = "".join(ch for ch in s if ch.isdigit())
+    return s.zfill(6)[:6] if s else None
+
+# ---------- helpers geometrías (contornos) ----------
+def index_distritos(distritos_gj: dict) -> dict:
+    """UBIGEO de 6 dígitos (IDDIST) -> features de distrito, en el orden del GeoJSON."""
+    idx = {}
+    for feat in distritos_gj.get("features", []):
+        props = feat.get("properties") or {}
+        idx.setdefault(to_ubigeo6(props.get("IDDIST")), []).append(feat)
+    return idx
+
+def index_provincias(prov_gj_list: list) -> tuple:
+    """
+    Índices de provincias: UBIGEO de 6 dígitos (cualquier propiedad con 'ubigeo' en el nombre) y
+    IDPROV de 4 dígitos -> [(orden, feature)]. El orden global permite devolver los features de una
+    consulta en el mismo orden que el recorrido de los GeoJSON.
+    """
+    by6, by4 = {}, {}
+    n = 0
+    for prov_gj in prov_gj_list:
+        for feat in prov_gj.get("features", []):
+            props = feat.get("properties") or {}
+            for k, v in props.items():
+                if "ubigeo" in str(k).lower():
+                    by6.setdefault(to_ubigeo6(v), []).append((n, feat))
+            idprov = props.get("IDPROV")
+            if idprov is not None:
+                v = "".join(ch for ch in str(idprov) if ch.isdigit())
+                by4.setdefault(v.zfill(4)[:4], []).append((n, feat))
+            n += 1
+    return by6, by4
+
+def features_distrito_por_ubigeo(distritos_idx: dict, target_ubi6: str):
+    return list(distritos_idx.get(target_ubi6, []))
+
+def features_provincia_por_ubigeo(provincias_idx: tuple, target_ubi6: str):
+    # Un feature entra si alguna propiedad 'ubigeo' coincide o, si no, por IDPROV (una sola vez)
+    by6, by4 = provincias_idx
+    hits = dict(by6.get(target_ubi6, []))
+    if target_ubi6:
+        hits.update(by4.get(target_ubi6[:4], []))
+    return [hits[k] for k in sorted(hits)]
+
+def ubigeos_de_excels(excel_files):
+    """
+    UBIGEOs (6 dígitos) de la columna ubigeo_gestor de todos los Excel, leyendo solo esa columna
+    (encabezado sin espacios y en minúscula, como en map_for_excel). Devuelve None si algún Excel
+    no se puede leer: sin la lista completa no se poda ningún contorno.
+    """
+    wanted = set()
+    for x in excel_files:
+        try:
+            df = pd.read_excel(x, usecols=lambda c: str(c).strip().lower() == "ubigeo_gestor",
+                               dtype=str, engine=_EXCEL_ENGINE)
+        except Exception as e:
+            print(f"[Aviso] {x}: no se pudo leer ubigeo_gestor ({e}); se usan todos los contornos.")
+            return None
+        for c in df.columns:
+            wanted.update(u for u in map(to_ubigeo6, df[c].dropna().unique()) if u)
+    return wanted
+
+def filtrar_indices(distritos_idx: dict, provincias_idx: tuple, wanted):
+    """
+    Deja en los índices de contornos solo los UBIGEOs de `wanted` (y sus provincias). Con
+    `wanted` None (ver ubigeos_de_excels) los devuelve completos.
+    """
+    if wanted is None:
+        return distritos_idx, provincias_idx
+    by6, by4 = provincias_idx
+    wanted4 = {u[:4] for u in wanted}
+    return ({k: v for k, v in distritos_idx.items() if k in wanted},
+            ({k: v for k, v in by6.items() if k in wanted}, {k: v for k, v in by4.items() if k in wanted4}))
+
+# ---------- punto en polígono (vectorizado, NumPy) ----------
+# Test de cruce de rayo (par/impar): un punto está dentro de un anillo si una semirrecta hacia +x
+# cruza un número impar de aristas, con x_inter = (x2 - x1) * (lat - y1) / (y2 - y1 + 1e-15) + x1.
+# Se evalúan todos los siniestros contra todas las aristas con operaciones de arreglo (sin bucle
+# Python por arista).
+_PIP_BLOCK = 1 << 21  # máx. celdas puntos×aristas por bloque (acota la memoria temporal)
+_BAND_MIN_EDGES = 256  # anillos con menos aristas no necesitan índice por franjas
+
+def _ring_edges(ring):
+    """
+    Aristas de un anillo como arreglos (x1, y1, x2, y2), el último vértice cierra con el primero,
+    y su caja envolvente (minx, miny, maxx, maxy).
+    """
+    xy = np.asarray(ring, dtype=np.float64)[:, :2]
+    x1, y1 = np.ascontiguousarray(xy[:, 0]), np.ascontiguousarray(xy[:, 1])
+    edges = (x1, y1, np.roll(x1, -1), np.roll(y1, -1))
+    bbox = (x1.min(), y1.min(), x1.max(), y1.max())
+    bands = _band_index(edges, bbox[1], bbox[3]) if len(x1) >= _BAND_MIN_EDGES else None
+    return edges, bbox, bands
+
+def _band_index(edges, miny, maxy):
+    """
+    Índice por franjas horizontales (intervalos en y): cada arista se asigna a todas las franjas
+    que toca su rango [ymin, ymax]. Una arista solo puede cruzar el rayo de un punto si su rango
+    contiene la latitud del punto, así que basta probar las aristas de la franja del punto.
+    Devuelve (alto_franja, [aristas de cada franja]).
+    """
+    x1, y1, x2, y2 = edges
+    nb = max(1, int(np.sqrt(len(x1))))
+    h = (maxy - miny) / nb or 1.0
+    lo = np.clip(((np.minimum(y1, y2) - miny) / h).astype(np.int64), 0, nb - 1)
+    hi = np.clip(((np.maximum(y1, y2) - miny) / h).astype(np.int64), 0, nb - 1)
+    cnt = hi - lo + 1
+    eid = np.repeat(np.arange(len(x1)), cnt)
+    bid = np.repeat(lo, cnt) + (np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt))
+    order = np.argsort(bid, kind="stable")
+    eid, bid = eid[order], bid[order]
+    cuts = np.searchsorted(bid, np.arange(nb + 1))
+    return h, [tuple(a[eid[cuts[b]:cuts[b + 1]]] for a in edges) for b in range(nb)]
+
+def _prepare_rings(feats):
+    """
+    Aplana las geometrías una sola vez por mapa: lista de polígonos, cada uno como
+    (aristas_exterior, [aristas_hueco, ...]).
+    """
+    polys = []
+    for feat in feats:
+        geom = feat.get("geometry") or {}
+        coords = geom.get("coordinates")
+        if not coords:
+            continue
+        gtype = geom.get("type")
+        if gtype == "Polygon":
+            plist = [coords]
+        elif gtype == "MultiPolygon":
+            plist = coords
+        else:
+            continue
+        for poly in plist:
+            if not poly or not poly[0]:
+                continue
+            polys.append((_ring_edges(poly[0]), [_ring_edges(h) for h in poly[1:] if h]))
+    return polys
+
+# ---------- simplificación del contorno (solo para dibujar) ----------
+# Los polígonos de distritos/provincias traen miles de vértices a precisión de metros; a los
+# zooms del mapa no se distinguen. El contorno que va al HTML se simplifica con Douglas-Peucker;
+# el punto-en-polígono de los siniestros sigue usando la geometría original.
+_SIMPLIFY_TOL = 1e-4  # grados (~11 m)
+_COORD_DECIMALS = 6   # ~0.1 m; suficiente para dibujar
+
+def _douglas_peucker(xy, tol):
+    """Máscara de vértices que conserva Douglas-Peucker (iterativo, sin recursión)."""
+    n = len(xy)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = xy[b] - xy[a]
+        pts = xy[a + 1:b] - xy[a]
+        norm = np.hypot(seg[0], seg[1])
+        if norm == 0.0:  # anillo cerrado (a y b son el mismo punto): distancia al punto
+            d = np.hypot(pts[:, 0], pts[:, 1])
+        else:
+            d = np.abs(seg[0] * pts[:, 1] - seg[1] * pts[:, 0]) / norm
+        k = int(np.argmax(d))
+        if d[k] > tol:
+            i = a + 1 + k
+            keep[i] = True
+            stack.append((a, i))
+            stack.append((i, b))
+    return keep
+
+def _simplify_ring(ring, tol):
+    xy = np.asarray(ring, dtype=np.float64)[:, :2]
+    if len(xy) > 4:
+        kept = xy[_douglas_peucker(xy, tol)]
+        if len(kept) >= 4:  # un anillo válido necesita al menos 4 posiciones
+            xy = kept
+    return np.round(xy, _COORD_DECIMALS).tolist()
+
+def _simplify_feat(feat, tol=_SIMPLIFY_TOL):
+    """Copia de `feat` con la geometría simplificada para dibujar (Polygon/MultiPolygon)."""
+    geom = feat.get("geometry") or {}
+    gtype = geom.get("type")
+    coords = geom.get("coordinates")
+    if not coords or gtype not in ("Polygon", "MultiPolygon"):
+        return feat
+    if gtype == "Polygon":
+        coords = [_simplify_ring(r, tol) for r in coords if r]
+    else:
+        coords = [[_simplify_ring(r, tol) for r in poly if r] for poly in coords if poly]
+    return dict(feat, geometry=dict(geom, coordinates=coords))
+
+if njit is not None:
+    # Misma fórmula que la versión NumPy, sin fastmath (resultados idénticos a la versión NumPy);
+    # error_model="numpy": una división por cero da inf en vez de lanzar excepción.
+    @njit(cache=True, error_model="numpy")
+    def _pip_ring_nb(lons, lats, x1, y1, x2, y2):
+        out = np.zeros(lons.shape[0], dtype=np.bool_)
+        for i in range(lons.shape[0]):
+            lon = lons[i]
+            lat = lats[i]
+            inside = False
+            for k in range(x1.shape[0]):
+                if (y1[k] > lat) != (y2[k] > lat):
+                    if (x2[k] - x1[k]) * (lat - y1[k]) / (y2[k] - y1[k] + 1e-15) + x1[k] > lon:
+                        inside = not inside
+            out[i] = inside
+        return out
+else:
+    _pip_ring_nb = None
+
+def _crossings(lons, lats, edges):
+    if _pip_ring_nb is not None:
+        return _pip_ring_nb(lons, lats, *edges)
+    x1, y1, x2, y2 = edges
+    out = np.zeros(len(lons), dtype=bool)
+    step = max(1, _PIP_BLOCK // max(len(x1), 1))
+    dx = x2 - x1
+    dy = y2 - y1 + 1e-15
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for s in range(0, len(lons), step):
+            lon = lons[s:s + step, None]
+            lat = lats[s:s + step, None]
+            # Sin ramas y en el lugar (un solo temporal float y uno bool por bloque), con la
+            # misma aritmética que el kernel numba: el resultado es idéntico bit a bit.
+            cond = np.greater(y1, lat)
+            cond ^= np.greater(y2, lat)
+            x_inter = np.subtract(lat, y1)
+            x_inter *= dx
+            x_inter /= dy
+            x_inter += x1
+            cond &= np.greater(x_inter, lon)
+            out[s:s + step] = np.bitwise_xor.reduce(cond.view(np.uint8), axis=1).view(bool)
+    return out
+
+def _points_in_ring(lons, lats, ring):
+    edges, (minx, miny, maxx, maxy), bands = ring
+    # Descarte por caja envolvente (4 comparaciones por punto): el test de cruce solo corre
+    # sobre los puntos que pueden estar dentro.
+    cand = np.flatnonzero((lons >= minx) & (lons <= maxx) & (lats >= miny) & (lats <= maxy))
+    out = np.zeros(len(lons), dtype=bool)
+    if not cand.size:
+        return out
+    clon, clat = lons[cand], lats[cand]
+    if bands is None:
+        out[cand] = _crossings(clon, clat, edges)
+        return out
+    # Con índice: agrupar los puntos por franja y probar cada grupo solo con sus aristas.
+    h, band_edges = bands
+    b = np.clip(((clat - miny) / h).astype(np.int64), 0, len(band_edges) - 1)
+    order = np.argsort(b, kind="stable")
+    cuts = np.searchsorted(b[order], np.arange(len(band_edges) + 1))
+    res = np.zeros(cand.size, dtype=bool)
+    for band in np.flatnonzero(np.diff(cuts)):
+        sel = order[cuts[band]:cuts[band + 1]]
+        res[sel] = _crossings(clon[sel], clat[sel], band_edges[band])
+    out[cand] = res
+    return out
+
+def points_in_features(lons, lats, prepared):
+    """Máscara booleana: True si el punto cae en algún polígono de `prepared` (_prepare_rings)."""
+    lons = np.asarray(lons, dtype=np.float64)
+    lats = np.asarray(lats, dtype=np.float64)
+    inside = np.zeros(len(lons), dtype=bool)
+    for ext, holes in prepared:
+        idx = np.flatnonzero(~inside)  # los que ya cayeron en otro polígono no se vuelven a probar
+        if not idx.size:
+            break
+        hit = _points_in_ring(lons[idx], lats[idx], ext)
+        for hole in holes:
+            sub = np.flatnonzero(hit)
+            if not sub.size:
+                break
+            hit[sub] = ~_points_in_ring(lons[idx[sub]], lats[idx[sub]], hole)
+        inside[idx] = hit
+    return inside
+
+# ---------- región del mapa (contorno + siniestros dentro), memoizada por UBIGEO ----------
+# Varios Excel comparten ubigeo_gestor: el filtrado de features y el punto-en-polígono de los
+# siniestros se hacen una vez por región y proceso. Supone que todas las llamadas del proceso
+# reciben los mismos datos compartidos (ver _init_worker).
+_REGION_CACHE = {}
+
+def resolve_region(target_ubi, distritos_idx: dict, provincias_idx: tuple, siniestros_df: pd.DataFrame):
+    """
+    (features del contorno simplificadas para dibujar, siniestros dentro del contorno) para
+    `target_ubi`. Los siniestros se filtran con la geometría original.
+    """
+    hit = _REGION_CACHE.get(target_ubi)
+    if hit is None:
+        feats = []
+        if target_ubi:
+            if target_ubi.endswith("01"):
+                feats = features_provincia_por_ubigeo(provincias_idx, target_ubi)
+            else:
+                feats = features_distrito_por_ubigeo(distritos_idx, target_ubi)
+        sub = siniestros_df.iloc[:0]
+        if feats and not siniestros_df.empty:
+            dentro = points_in_features(siniestros_df["__lon__"].to_numpy(), siniestros_df["__lat__"].to_numpy(),
+                                        _prepare_rings(feats))
+            sub = siniestros_df[dentro]
+        hit = _REGION_CACHE[target_ubi] = ([_simplify_feat(f) for f in feats], sub)
+    return hit
+
+# ---------- siniestros / GeoJSON ----------
+# Cadenas que pandas lee como NaN por defecto; con pyarrow se tratan igual
+_NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+              "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+def _read_csv_str(path: Path, enc: str) -> pd.DataFrame:
+    """
+    CSV con todas las columnas como texto, como read_csv(dtype=str, sep=None, engine="python").
+    Con pyarrow el separador se detecta con csv.Sniffer sobre la cabecera (igual que pandas) y el
+    archivo se parsea en C++ en vez de con el motor Python.
+    """
+    if pa_csv is None:
+        return pd.read_csv(path, dtype=str, sep=None, engine="python", encoding=enc)
+    with path.open("r", encoding=enc, newline="") as f:
+        header = f.readline()
+    delim = csv.Sniffer().sniff(header).delimiter
+    names = next(csv.reader([header], delimiter=delim))
+    table = pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(encoding=enc),
+        parse_options=pa_csv.ParseOptions(delimiter=delim),
+        convert_options=pa_csv.ConvertOptions(column_types={c: pa.string() for c in names},
+                                              strings_can_be_null=True, null_values=_NA_VALUES),
+    )
+    return table.to_pandas()
+
+def _detect_encoding(path: Path, encodings: list) -> str:
+    """
+    Primera codificación de la lista que decodifica el archivo completo. Se prueba sobre los bytes
+    en memoria (decodificación en C, sin parsear), así el CSV se parsea una sola vez.
+    """
+    raw = path.read_bytes()
+    last_err = None
+    for enc in encodings:
+        try:
+            raw.decode(enc)
+            return enc
+        except UnicodeDecodeError as e:
+            last_err = e
+    raise UnicodeError(f"No se pudo decodificar {path}. Último error: {last_err}")
+
+def load_geojson(path: Path) -> dict:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+# ---------- popups ----------
+def _safe_str(v):
+    # Caminos rápidos para lo habitual en una celda (str, None, float/NaN) sin pasar por el
+    # despacho de pandas; el resto (NaT, pd.NA, tipos NumPy...) como antes
+    if isinstance(v, str):
+        return v
+    if v is None:
+        return ""
+    if isinstance(v, float):
+        return "" if v != v else str(v)
+    try:
+        if pd.api.types.is_scalar(v):
+            return "" if pd.isna(v) else str(v)
+        return str(v)
+    except Exception:
+        return str(v)
+
+def _search_col(df: pd.DataFrame, col) -> list:
+    """Columna como lista de textos en minúsculas y sin espacios extremos (para el buscador)."""
+    if not col or col not in df.columns:
+        return [""] * len(df)
+    return df[col].map(_safe_str).str.lower().str.strip().tolist()
+
+# Muchas columnas repiten pocos valores (departamento, provincia, tipo de vía...): cada valor
+# distinto se escapa una sola vez por proceso
+_escape = lru_cache(maxsize=4096)(escape)
+
+_TH_OPEN = "<tr><th style='text-align:left; padding:2px 8px 2px 0; white-space:nowrap;'>"
+_TD_OPEN = "</th><td style='padding:2px 0;'>"
+
+def precompute_popup_tmpl(df: pd.DataFrame, exclude) -> tuple:
+    """
+    Plantilla de popups de un DataFrame, por columnas: encabezados <th> ya escapados y, por
+    cada columna, el arreglo de valores ya escapados. Cada celda se escapa una sola vez.
+    """
+    keep = [c for c in df.columns if str(c).strip().lower() not in exclude]
+    ths = [_TH_OPEN + escape(str(c)) + _TD_OPEN for c in keep]
+    val_cols = [df[c].map(_safe_str).map(_escape).to_numpy() for c in keep]
+    return ths, val_cols
+
+def _popup_table(title: str, tmpl: tuple, i: int) -> str:
+    ths, val_cols = tmpl
+    return (
+        "<div style='font-size:12px;'>"
+        "<div style='font-weight:700; margin-bottom:6px;'>" + title + "</div>"
+        "<table style='border-collapse:collapse;'>"
+        + "".join([th + vals[i] + "</td></tr>" for th, vals in zip(ths, val_cols)]) +
+        "</table>"
+        "</div>"
+    )
+
+# ---------- capas masivas (JS Leaflet directo) ----------
+def _js_literal(v) -> str:
+    # Literal JS (JSON) que no puede cerrar el <script> que lo contiene
+    return json.dumps(v, ensure_ascii=False).replace("</", "<\\/")
+
+class _RawText(Element):
+    # Texto que se escribe tal cual al renderizar (sin plantilla Jinja)
+    def __init__(self, text: str):
+        super().__init__()
+        self.text = text
+
+    def render(self, **kwargs):
+        return self.text
+
+class _RawScript(MacroElement):
+    """
+    Bloque JS ya armado que va tal cual al <script> de la figura. Un MacroElement común vuelve a
+    compilar como plantilla Jinja lo que renderiza su macro: con miles de marcadores y popups eso
+    es lo más caro de m.save() (y un '{{' o '{#' dentro de un popup rompería la plantilla).
+    """
+    def __init__(self, js_code: str):
+        super().__init__()
+        self._name = "RawScript"
+        self.js_code = js_code
+
+    def render(self, **kwargs):
+        self.get_root().script.add_child(_RawText(self.js_code), name=self.get_name())
+
+def add_js_markers(fg: folium.FeatureGroup, lines: list, var_name: str = None, extra_vars: dict = None, **opts):
+    """
+    Agrega a `fg` muchos marcadores como JS Leaflet directo, en un solo bloque de script (sin un
+    objeto folium ni un render Jinja por marcador). Cada elemento de `lines` es una expresión que
+    usa `fg` (la capa) y los nombres de `opts` (opciones de estilo compartidas, van como JSON).
+    Con `var_name` los marcadores quedan en ese arreglo global, en el orden de `lines`;
+    `extra_vars` declara además variables globales con valores JSON.
+    """
+    names = ["fg"] + list(opts)
+    args = [fg.get_name()] + [json.dumps(v) for v in opts.values()]
+    head = "".join("var " + k + " = " + _js_literal(v) + ";\n" for k, v in (extra_vars or {}).items())
+    if var_name:
+        head += "var " + var_name + " = "
+    fg.add_child(_RawScript(head + "(function(" + ", ".join(names) + ") {\nreturn [\n" + ",\n".join(lines)
+                            + "\n];\n})(" + ", ".join(args) + ");\n"))
+
+def _marker_opts(radius, color, fill_opacity, interactive=True) -> dict:
+    # Mismas opciones de estilo que folium.Circle/CircleMarker con weight=2 y fill=True.
+    # En canvas no hay className ni pointer-events: los buffers se marcan como no interactivos
+    # para que los clics lleguen a los puntos.
+    o = {"radius": radius, "color": color, "weight": 2, "fill": True, "fillColor": color, "fillOpacity": fill_opacity}
+    if not interactive:
+        o["interactive"] = False
+    return o
+
+# ---------- ejecución en paralelo (un mapa por proceso) ----------
+_SHARED = {}
+
+def _init_worker(distritos_idx, provincias_idx, siniestros_df):
+    # Datos de solo lectura comunes a todos los mapas: se reciben una vez por proceso
+    _SHARED["args"] = (distritos_idx, provincias_idx, siniestros_df)
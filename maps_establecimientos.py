@@ -12,12 +12,22 @@ maps_establecimientos.py  (Establecimientos de Salud + siniestros + contorno + b
 """
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 import pandas as pd
 import folium
 from html import escape
-from branca.element import Template, MacroElement
+from branca.element import MacroElement, Template
+
+# Helpers compartidos por los tres scripts de mapas (contornos, punto en polígono, siniestros,
+# popups, marcadores en JS y workers)
+from maps_common import (
+    _EXCEL_ENGINE, to_ubigeo6, index_distritos, index_provincias, ubigeos_de_excels,
+    filtrar_indices, resolve_region, load_geojson, _read_csv_str, _detect_encoding, _search_col,
+    precompute_popup_tmpl, _popup_table, _js_literal, _RawScript, add_js_markers, _marker_opts,
+    _SHARED, _init_worker,
+)
 
 COLOR_EST      = "#1d4ed8"   # azul establecimientos
 COLOR_FATAL    = "#d90429"   # rojo siniestros
@@ -25,15 +35,6 @@ COLOR_HILITE   = "#f59e0b"   # amarillo resaltado
 COLOR_CONTORNO = "#9ca3af"   # plomo (Tailwind gray-400 aprox)
 
 # ---------------- util ----------------
-def to_ubigeo6(x):
-    if x is None:
-        return None
-    s = str(x).strip()
-    if s.endswith(".0"):
-        s = s[:-2]
-    s = "".join(ch for ch in s if ch.isdigit())
-    return s.zfill(6)[:6] if s else None
-
 def scan_excels(excels_root: Path):
     return sorted(excels_root.rglob("*.xlsx"))
 
@@ -77,91 +78,9 @@ def add_legend(m: folium.Map):
     """
     m.get_root().html.add_child(folium.Element(html))
 
-# ---------- helpers geometrías (contornos) ----------
-def features_distrito_por_ubigeo(distritos_gj: dict, target_ubi6: str):
-    feats = []
-    for feat in distritos_gj.get("features", []):
-        props = feat.get("properties") or {}
-        iddist = props.get("IDDIST")
-        if to_ubigeo6(iddist) == target_ubi6:
-            feats.append(feat)
-    return feats
-
-def features_provincia_por_ubigeo(prov_gj_list: list, target_ubi6: str):
-    target4 = target_ubi6[:4] if target_ubi6 else None
-    feats = []
-    for prov_gj in prov_gj_list:
-        for feat in prov_gj.get("features", []):
-            props = feat.get("properties") or {}
-            matched = False
-            for k, v in props.items():
-                if "ubigeo" in str(k).lower():
-                    if to_ubigeo6(v) == target_ubi6:
-                        feats.append(feat); matched = True
-                        break
-            if matched:
-                continue
-            idprov = props.get("IDPROV")
-            if idprov is not None and target4 is not None:
-                v = "".join(ch for ch in str(idprov) if ch.isdigit())
-                v = v.zfill(4)[:4]
-                if v == target4:
-                    feats.append(feat)
-    return feats
-
-# ---------- punto en polígono ----------
-def _point_in_ring(lon, lat, ring):
-    inside = False
-    if not ring: return False
-    n = len(ring)
-    for i in range(n):
-        x1, y1 = ring[i][0], ring[i][1]
-        x2, y2 = ring[(i + 1) % n][0], ring[(i + 1) % n][1]
-        if ((y1 > lat) != (y2 > lat)):
-            x_inter = (x2 - x1) * (lat - y1) / (y2 - y1 + 1e-15) + x1
-            if x_inter > lon:
-                inside = not inside
-    return inside
-
-def point_in_polygon(lon, lat, polygon_coords):
-    if not polygon_coords: return False
-    exterior = polygon_coords[0]
-    if not _point_in_ring(lon, lat, exterior):
-        return False
-    for hole in polygon_coords[1:]:
-        if _point_in_ring(lon, lat, hole):
-            return False
-    return True
-
-def point_in_features(lon, lat, feats):
-    for feat in feats:
-        geom = feat.get("geometry") or {}
-        gtype = geom.get("type")
-        coords = geom.get("coordinates")
-        if not coords:
-            continue
-        if gtype == "Polygon":
-            if point_in_polygon(lon, lat, coords):
-                return True
-        elif gtype == "MultiPolygon":
-            for poly in coords:
-                if point_in_polygon(lon, lat, poly):
-                    return True
-    return False
-
 # ---------- siniestros ----------
 def load_siniestros_csv(path: Path) -> pd.DataFrame:
-    encodings = ["utf-8-sig", "cp1252", "latin-1", "utf-16", "utf-8"]
-    last_err = None
-    for enc in encodings:
-        try:
-            df = pd.read_csv(path, dtype=str, sep=None, engine="python", encoding=enc)
-            break
-        except UnicodeDecodeError as e:
-            last_err = e
-            continue
-    else:
-        raise UnicodeDecodeError(f"No se pudo decodificar {path}. Último error: {last_err}")
+    df = _read_csv_str(path, _detect_encoding(path, ["utf-8-sig", "cp1252", "latin-1", "utf-16", "utf-8"]))
 
     def pick_col(columns, *cands):
         cols = {str(c).strip().lower(): c for c in columns}
@@ -176,92 +95,44 @@ def load_siniestros_csv(path: Path) -> pd.DataFrame:
     if not col_lat or not col_lon:
         raise KeyError(f"Siniestros: no encuentro columnas lat/lon. Encabezados={list(df.columns)}")
 
-    df = df.copy()
     df["__lat__"] = pd.to_numeric(df[col_lat], errors="coerce")
     df["__lon__"] = pd.to_numeric(df[col_lon], errors="coerce")
     df = df.dropna(subset=["__lat__","__lon__"])
     return df
 
 # ---------- popups ----------
+_EXCLUDE_KEYS_SIN = {"__lat__","__lon__"}
 _EXCLUDE_KEYS_EST = {"ubigeo_gestor","ubigeo","departamento","provincia","distrito"}
 
-def _safe_str(v):
-    try:
-        if pd.api.types.is_scalar(v):
-            return "" if pd.isna(v) else str(v)
-        return str(v)
-    except Exception:
-        return str(v)
-
-def build_popup_est(row: pd.Series) -> str:
-    rows = []
-    for col, val in row.items():
-        if str(col).strip().lower() in _EXCLUDE_KEYS_EST:
-            continue
-        sval = _safe_str(val)
-        rows.append(
-            f"<tr>"
-            f"<th style='text-align:left; padding:2px 8px 2px 0; white-space:nowrap;'>{escape(str(col))}</th>"
-            f"<td style='padding:2px 0;'>{escape(sval)}</td>"
-            f"</tr>"
-        )
-    table_html = (
-        "<div style='font-size:12px;'>"
-        "<div style='font-weight:700; margin-bottom:6px;'>Establecimiento de salud priorizado</div>"
-        "<table style='border-collapse:collapse;'>"
-        + "".join(rows) +
-        "</table>"
-        "</div>"
-    )
-    return table_html
-
-def build_popup_siniestro(row: pd.Series) -> str:
-    rows = []
-    for col, val in row.items():
-        if col in ("__lat__","__lon__"):
-            continue
-        sval = _safe_str(val)
-        rows.append(
-            f"<tr>"
-            f"<th style='text-align:left; padding:2px 8px 2px 0; white-space:nowrap;'>{escape(str(col))}</th>"
-            f"<td style='padding:2px 0;'>{escape(sval)}</td>"
-            f"</tr>"
-        )
-    table_html = (
-        "<div style='font-size:12px;'>"
-        "<div style='font-weight:700; margin-bottom:6px;'>Siniestro fatal</div>"
-        "<table style='border-collapse:collapse;'>"
-        + "".join(rows) +
-        "</table>"
-        "</div>"
-    )
-    return table_html
+def build_popup_est(tmpl: tuple, i: int) -> str:
+    return _popup_table("Establecimiento de salud priorizado", tmpl, i)
+
+def build_popup_siniestro(tmpl: tuple, i: int) -> str:
+    return _popup_table("Siniestro fatal", tmpl, i)
 
 # ---------- core ----------
-def map_for_excel(xlsx_path: Path, out_dir: Path, distritos_gj: dict, provincias_gj_list: list, siniestros_df: pd.DataFrame) -> Path:
-    df = pd.read_excel(xlsx_path, dtype=str)
+def map_for_excel(xlsx_path: Path, out_dir: Path, distritos_idx: dict, provincias_idx: tuple, siniestros_df: pd.DataFrame) -> Path:
+    df = pd.read_excel(xlsx_path, dtype=str, engine=_EXCEL_ENGINE)
     df.columns = [str(c).strip().lower() for c in df.columns]
 
     missing = [c for c in ("latitud","longitud") if c not in df.columns]
     if missing:
         raise KeyError(f"{xlsx_path.name}: faltan columnas {missing}")
 
-    df = df.copy()
     df["latitud"]  = pd.to_numeric(df["latitud"], errors="coerce")
     df["longitud"] = pd.to_numeric(df["longitud"], errors="coerce")
     df = df.dropna(subset=["latitud","longitud"])
     if df.empty:
         raise ValueError(f"{xlsx_path.name}: no hay filas con lat/lon válidas")
 
-    lat0 = float(df["latitud"].mean())
-    lon0 = float(df["longitud"].mean())
-    m = folium.Map(location=[lat0, lon0], tiles="OpenStreetMap", zoom_start=14, control_scale=True)
+    # Coordenadas extraídas una sola vez; centro y límites salen de los mismos arrays
+    lat_arr = df["latitud"].to_numpy(dtype=float); lon_arr = df["longitud"].to_numpy(dtype=float)
+    m = folium.Map(location=[float(lat_arr.mean()), float(lon_arr.mean())], tiles="OpenStreetMap", zoom_start=14, control_scale=True,
+                   prefer_canvas=True)  # un solo <canvas> para todos los vectores, no un nodo SVG por marcador
 
     # CSS (NO f-string)
     m.get_root().html.add_child(folium.Element("""
     <style>
-      .leaflet-interactive.zs-buffer { pointer-events: none !important; }
-
       .searchbar-wrap {
         position: fixed; right: 20px; bottom: 140px;
         z-index: 10000; background: rgba(255,255,255,0.95);
@@ -311,77 +182,48 @@ def map_for_excel(xlsx_path: Path, out_dir: Path, distritos_gj: dict, provincias
 
     # Contorno
     target_ubi = to_ubigeo6(df["ubigeo_gestor"].dropna().iloc[0]) if "ubigeo_gestor" in df.columns and df["ubigeo_gestor"].notna().any() else None
-    feats = []
-    if target_ubi:
-        if target_ubi.endswith("01"):
-            feats = features_provincia_por_ubigeo(provincias_gj_list, target_ubi)
-        else:
-            feats = features_distrito_por_ubigeo(distritos_gj, target_ubi)
-        if feats:
-            gj_filtrado = {"type": "FeatureCollection", "features": feats}
-            folium.GeoJson(
-                data=gj_filtrado,
-                name="Contorno territorial",
-                style_function=lambda feat: {
-                    "color": "#222222",
-                    "weight": 2.5,
-                    "opacity": 1.0,
-                    "fill": True,
-                    "fillColor": COLOR_CONTORNO,
-                    "fillOpacity": 0.3
-                }
-            ).add_to(fg_contorno)
+    feats, sin_dentro = resolve_region(target_ubi, distritos_idx, provincias_idx, siniestros_df)
+    if feats:
+        gj_filtrado = {"type": "FeatureCollection", "features": feats}
+        estilo = {
+            "color": "#222222",
+            "weight": 2.5,
+            "opacity": 1.0,
+            "fill": True,
+            "fillColor": COLOR_CONTORNO,
+            "fillOpacity": 0.3
+        }
+        # L.geoJson directo (como los marcadores): el GeoJSON no pasa por Jinja
+        fg_contorno.add_child(_RawScript(
+            "L.geoJson(" + _js_literal(gj_filtrado) + ", {style: function() { return " + json.dumps(estilo)
+            + "; }}).addTo(" + fg_contorno.get_name() + ");\n"))
 
     # Establecimientos
-    bounds = []
-    for _, row in df.iterrows():
-        lat = float(row["latitud"]); lon = float(row["longitud"])
-        name_raw = _safe_str(row.get("nombre_establecimiento", ""))
-        code_raw = _safe_str(row.get("codigo_unico", ""))
-
-        folium.Circle(
-            location=(lat, lon),
-            radius=100,
-            color=COLOR_EST,
-            weight=2,
-            fill=True,
-            fill_color=COLOR_EST,
-            fill_opacity=0.5,
-            interactive=False,
-            class_name="zs-buffer"
-        ).add_to(fg_buffers)
-
-        marker = folium.CircleMarker(
-            location=(lat, lon),
-            radius=5,
-            color=COLOR_EST,
-            weight=2,
-            fill=True,
-            fill_color=COLOR_EST,
-            fill_opacity=1.0,
-            popup=folium.Popup(build_popup_est(row), max_width=500),
-        )
-        tooltip_text = (name_raw or "").lower() + " | " + (code_raw or "").lower()
-        folium.Tooltip(tooltip_text, sticky=False, opacity=0).add_to(marker)
-        marker.add_to(fg_puntos)
-
-        bounds.append((lat, lon))
+    # Columnas extraídas una sola vez como listas: el bucle solo recorre floats/str de Python
+    tmpl = precompute_popup_tmpl(df, _EXCLUDE_KEYS_EST)
+    lats = lat_arr.tolist(); lons = lon_arr.tolist()
+    # Índice del buscador: [nombre, código] en minúsculas, alineado con los puntos
+    search_idx = [list(p) for p in zip(_search_col(df, "nombre_establecimiento"), _search_col(df, "codigo_unico"))]
+    js_buf, js_pts = [], []
+    for i, (lat, lon) in enumerate(zip(lats, lons)):
+        js_buf.append(f"L.circle([{lat!r}, {lon!r}], o).addTo(fg)")
+        js_pts.append(f"L.circleMarker([{lat!r}, {lon!r}], o).bindPopup({_js_literal(build_popup_est(tmpl, i))}, pp).addTo(fg)")
+
+    add_js_markers(fg_buffers, js_buf, o=_marker_opts(100, COLOR_EST, 0.5, interactive=False))
+    add_js_markers(fg_puntos, js_pts, var_name=fg_puntos.get_name() + "_markers",
+                   extra_vars={fg_puntos.get_name() + "_search": search_idx},
+                   o=_marker_opts(5, COLOR_EST, 1.0), pp={"maxWidth": 500})
 
     # Siniestros dentro del contorno
     if feats and not siniestros_df.empty:
-        for _, r in siniestros_df.iterrows():
-            slat = float(r["__lat__"]); slon = float(r["__lon__"])
-            if point_in_features(slon, slat, feats):
-                folium.CircleMarker(
-                    location=(slat, slon),
-                    radius=5,
-                    color=COLOR_FATAL,
-                    weight=2,
-                    fill=True,
-                    fill_color=COLOR_FATAL,
-                    fill_opacity=1.0,
-                    popup=folium.Popup(build_popup_siniestro(r), max_width=500),
-                ).add_to(fg_siniestros)
+        sub = sin_dentro
+        tmpl_sin = precompute_popup_tmpl(sub, _EXCLUDE_KEYS_SIN)
+        slats = sub["__lat__"].to_numpy(dtype=float).tolist(); slons = sub["__lon__"].to_numpy(dtype=float).tolist()
+        js_sin = [
+            f"L.circleMarker([{slat!r}, {slon!r}], o).bindPopup({_js_literal(build_popup_siniestro(tmpl_sin, j))}, pp).addTo(fg)"
+            for j, (slat, slon) in enumerate(zip(slats, slons))
+        ]
+        add_js_markers(fg_siniestros, js_sin, o=_marker_opts(5, COLOR_FATAL, 1.0), pp={"maxWidth": 500})
 
     # Traer al frente (Template sin f-string; reemplazo de marcadores)
     tpl_front = Template("""
@@ -393,8 +235,9 @@ def map_for_excel(xlsx_path: Path, out_dir: Path, distritos_gj: dict, provincias
     me_front = MacroElement(); me_front._template = tpl_front
     m.get_root().add_child(me_front)
 
-    if len(bounds) >= 2:
-        m.fit_bounds(bounds)
+    # Solo las dos esquinas: Leaflet ajusta igual y el HTML no repite todos los puntos
+    if len(lats) >= 2:
+        m.fit_bounds([[float(lat_arr.min()), float(lon_arr.min())], [float(lat_arr.max()), float(lon_arr.max())]])
 
     folium.LayerControl(collapsed=True).add_to(m)
 
@@ -483,11 +326,63 @@ def map_for_excel(xlsx_path: Path, out_dir: Path, distritos_gj: dict, provincias
             });
           }
 
-          function getTooltipText(ly) {
-            try {
-              var t = ly.getTooltip();
-              return t ? String(t.getContent() || '').toLowerCase() : '';
-            } catch(e) { return ''; }
+          // Índice del buscador armado en Python: [nombre, código] en minúsculas, alineado con markers
+          var searchIdx = __PUNTOS_SEARCH__;
+          var markers = __PUNTOS_MARKERS__;
+
+          // Índice de trigramas por columna (se arma en la primera búsqueda): trigrama -> posiciones
+          // ascendentes en searchIdx. Una consulta de 3+ caracteres solo revisa la intersección de sus
+          // listas; las más cortas caen al recorrido completo.
+          var triIdx = null;
+          function buildTrigrams() {
+            triIdx = [{}, {}];
+            for (var i = 0; i < searchIdx.length; i++) {
+              for (var c = 0; c < 2; c++) {
+                var s = searchIdx[i][c], seen = {};
+                for (var k = 0; k + 3 <= s.length; k++) {
+                  var g = s.substr(k, 3);
+                  if (seen[g]) continue;
+                  seen[g] = 1;
+                  (triIdx[c][g] || (triIdx[c][g] = [])).push(i);
+                }
+              }
+            }
+          }
+
+          function intersectSorted(a, b) {
+            var out = [], i = 0, j = 0;
+            while (i < a.length && j < b.length) {
+              if (a[i] === b[j]) { out.push(a[i]); i++; j++; }
+              else if (a[i] < b[j]) i++;
+              else j++;
+            }
+            return out;
+          }
+
+          // Candidatos para q en la columna c; null = sin filtro (consulta de menos de 3 caracteres)
+          function candidates(q, c) {
+            if (q.length < 3) return null;
+            if (!triIdx) buildTrigrams();
+            var lists = [];
+            for (var k = 0; k + 3 <= q.length; k++) {
+              var p = triIdx[c][q.substr(k, 3)];
+              if (!p) return [];
+              lists.push(p);
+            }
+            lists.sort(function(a, b) { return a.length - b.length; });
+            var out = lists[0];
+            for (var j = 1; j < lists.length && out.length > 0; j++) out = intersectSorted(out, lists[j]);
+            return out;
+          }
+
+          // Agrega a `found` las posiciones cuya columna c contiene q (confirmado con indexOf)
+          function collectMatches(q, c, hit, found) {
+            var cand = candidates(q, c);
+            var n = cand ? cand.length : searchIdx.length;
+            for (var k = 0; k < n; k++) {
+              var i = cand ? cand[k] : k;
+              if (!hit[i] && searchIdx[i][c].indexOf(q) !== -1) { hit[i] = 1; found.push(i); }
+            }
           }
 
           function clearHighlights() {
@@ -510,20 +405,14 @@ def map_for_excel(xlsx_path: Path, out_dir: Path, distritos_gj: dict, provincias
             if (!useName && !useCode) return;
 
             var matchedLatLngs = [];
-            eachMarker(function(ly) {
-              var txt = getTooltipText(ly); // "nombre | codigo"
-              var parts = txt.split('|', 2);
-              var nameTxt = (parts[0] || '').trim();
-              var codeTxt = (parts[1] || '').trim();
-
-              var matchName = useName ? (nameTxt.indexOf(qn) !== -1) : false;
-              var matchCode = useCode ? (codeTxt.indexOf(qc) !== -1) : false;
-
-              if (matchName || matchCode) {
-                ly.setStyle({ color: hiliteColor, fillColor: hiliteColor });
-                if (ly.getLatLng) matchedLatLngs.push(ly.getLatLng());
-              }
-            });
+            var hit = {}, found = [];
+            if (useName) collectMatches(qn, 0, hit, found);
+            if (useCode) collectMatches(qc, 1, hit, found);
+            for (var f = 0; f < found.length; f++) {
+              var ly = markers[found[f]];
+              ly.setStyle({ color: hiliteColor, fillColor: hiliteColor });
+              if (ly.getLatLng) matchedLatLngs.push(ly.getLatLng());
+            }
 
             if (matchedLatLngs.length > 0) {
               var group = L.featureGroup(matchedLatLngs.map(function(ll) { return L.marker(ll); }));
@@ -636,6 +525,8 @@ def map_for_excel(xlsx_path: Path, out_dir: Path, distritos_gj: dict, provincias
     {% endmacro %}
     """
     tpl = tpl.replace("__FG_PUNTOS__", fg_puntos.get_name()) \
+             .replace("__PUNTOS_SEARCH__", fg_puntos.get_name() + "_search") \
+             .replace("__PUNTOS_MARKERS__", fg_puntos.get_name() + "_markers") \
              .replace("__COLOR_EST__", COLOR_EST) \
              .replace("__COLOR_HILITE__", COLOR_HILITE)
 
@@ -649,16 +540,25 @@ def map_for_excel(xlsx_path: Path, out_dir: Path, distritos_gj: dict, provincias
     m.save(str(out_path))
     return out_path
 
+# ---------- ejecución en paralelo (un mapa por proceso) ----------
+def map_for_excel_wrapped(xlsx_path: Path, out_dir: Path) -> Path:
+    return map_for_excel(xlsx_path, out_dir, *_SHARED["args"])
+
 def write_index(index_path: Path, items):
     index_path.parent.mkdir(parents=True, exist_ok=True)
-    lis = "\n".join(f'<li><a href="{p.name}" target="_blank">{p.name}</a></li>' for p in items)
-    html = f"""<!doctype html>
+    # Escritura en streaming: un <li> por mapa, sin armar todo el HTML en memoria
+    with index_path.open("w", encoding="utf-8") as f:
+        f.write("""<!doctype html>
 <html lang="es"><head><meta charset="utf-8"><title>Mapas de Establecimientos de Salud</title></head>
 <body>
 <h1>Mapas generados</h1>
-<ul>{lis}</ul>
-</body></html>"""
-    index_path.write_text(html, encoding="utf-8")
+<ul>""")
+        for i, p in enumerate(items):
+            if i:
+                f.write("\n")
+            f.write(f'<li><a href="{p.name}" target="_blank">{p.name}</a></li>')
+        f.write("""</ul>
+</body></html>""")
 
 # ---------------- main ----------------
 def main():
@@ -668,6 +568,7 @@ def main():
     ap.add_argument("--distritos-geojson", default="./Data/Distritos.geojson", help="GeoJSON de distritos (usa clave IDDIST).")
     ap.add_argument("--provincias-geojson", nargs="+", default=["./Data/Provincias1.geojson", "./Data/Provincias2.geojson"], help="Uno o más GeoJSON de provincias (propiedad con 'ubigeo' o IDPROV).")
     ap.add_argument("--siniestros-csv",    default="./Data/Siniestros.csv", help="CSV de siniestros con columnas lat/lon (latitud/longitud, etc.).")
+    ap.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo).")
     args = ap.parse_args()
 
     excels_root = Path(args.excels_dir)
@@ -675,15 +576,14 @@ def main():
 
     distritos_path = Path(args.distritos_geojson)
     assert distritos_path.exists(), f"No existe: {distritos_path}"
-    with distritos_path.open("r", encoding="utf-8") as f:
-        distritos_gj = json.load(f)
+    distritos_idx = index_distritos(load_geojson(distritos_path))
 
     provincias_gj_list = []
     for p in args.provincias_geojson:
         pp = Path(p)
         assert pp.exists(), f"No existe: {pp}"
-        with pp.open("r", encoding="utf-8") as f:
-            provincias_gj_list.append(json.load(f))
+        provincias_gj_list.append(load_geojson(pp))
+    provincias_idx = index_provincias(provincias_gj_list)
 
     siniestros_path = Path(args.siniestros_csv)
     assert siniestros_path.exists(), f"No existe: {siniestros_path}"
@@ -698,14 +598,21 @@ def main():
     #excel_files = excel_files[:1]
     #print(f"Procesando solo el primer archivo: {excel_files[0].name}")
 
+    # Solo los contornos que piden estos Excel: los workers reciben índices chicos
+    distritos_idx, provincias_idx = filtrar_indices(distritos_idx, provincias_idx, ubigeos_de_excels(excel_files))
+
     generated = []
-    for x in excel_files:
-        try:
-            out_html = map_for_excel(x, out_root, distritos_gj, provincias_gj_list, siniestros_df)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(distritos_idx, provincias_idx, siniestros_df)) as pool:
+        futures = [(x, pool.submit(map_for_excel_wrapped, x, out_root)) for x in excel_files]
+        for x, fut in futures:
+            e = fut.exception()
+            if e is not None:
+                print(f"[ERROR] {x}: {e}")
+                continue
+            out_html = fut.result()
             print(f"[OK] {x.name} -> {out_html}")
             generated.append(out_html)
-        except Exception as e:
-            print(f"[ERROR] {x}: {e}")
 
     if generated:
         write_index(out_root / "_index_maps.html", generated)